@@ -18,6 +18,7 @@ CREATE SEQUENCE IF NOT EXISTS zta.network_latency_simulation_id_seq;
 CREATE SEQUENCE IF NOT EXISTS zta.performance_metrics_id_seq;
 CREATE SEQUENCE IF NOT EXISTS zta.security_classifications_id_seq;
 CREATE SEQUENCE IF NOT EXISTS zta.session_continuity_metrics_id_seq;
+CREATE SEQUENCE IF NOT EXISTS zta.sla_timeouts_id_seq;
 CREATE SEQUENCE IF NOT EXISTS zta.stride_threat_simulation_id_seq;
 CREATE SEQUENCE IF NOT EXISTS zta.thesis_metrics_id_seq;
 
@@ -238,6 +239,19 @@ CREATE TABLE IF NOT EXISTS zta.siem_alerts (
   CONSTRAINT siem_alerts_pkey PRIMARY KEY (id)
 );
 
+-- Table: sla_timeouts
+-- Purpose: Simulator samples dropped for exceeding SIM_SLA_TIMEOUT_S (censored latencies)
+CREATE TABLE IF NOT EXISTS zta.sla_timeouts (
+  id integer NOT NULL DEFAULT nextval('zta.sla_timeouts_id_seq'::regclass),
+  comparison_id character varying NOT NULL,
+  session_id character varying NOT NULL,
+  original_label character varying,
+  timed_out_frameworks jsonb DEFAULT '[]'::jsonb,
+  sla_timeout_s numeric NOT NULL,
+  created_at timestamp with time zone DEFAULT now(),
+  CONSTRAINT sla_timeouts_pkey PRIMARY KEY (id)
+);
+
 -- Table: stride_threat_simulation
 -- Purpose: STRIDE threat detection accuracy metrics
 CREATE TABLE IF NOT EXISTS zta.stride_threat_simulation (
@@ -319,6 +333,7 @@ CREATE INDEX IF NOT EXISTS idx_thesis_metrics_session_framework ON zta.thesis_me
 CREATE INDEX IF NOT EXISTS idx_thesis_metrics_created_at ON zta.thesis_metrics(created_at);
 CREATE INDEX IF NOT EXISTS idx_framework_comparison_session ON zta.framework_comparison(session_id);
 CREATE INDEX IF NOT EXISTS idx_framework_comparison_created_at ON zta.framework_comparison(created_at);
+CREATE INDEX IF NOT EXISTS idx_sla_timeouts_comparison ON zta.sla_timeouts(comparison_id);
 CREATE INDEX IF NOT EXISTS idx_siem_alerts_session ON zta.siem_alerts(session_id);
 CREATE INDEX IF NOT EXISTS idx_siem_alerts_stride ON zta.siem_alerts(stride);
 CREATE INDEX IF NOT EXISTS idx_trust_decisions_session ON zta.trust_decisions(session_id);
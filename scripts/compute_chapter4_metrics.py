@@ -12,7 +12,6 @@ Writes: scripts/chapter4_metrics.json
 import json
 import math
 import os
-from statistics import median
 
 import psycopg2
 import psycopg2.extras
@@ -58,16 +57,6 @@ def resolve_run_id(conn):
     return row["comparison_id"]
 
 
-def _percentile(sorted_vals, pct):
-    if not sorted_vals:
-        return 0.0
-    k = (len(sorted_vals) - 1) * pct
-    f, c = int(k), min(int(k) + 1, len(sorted_vals) - 1)
-    if f == c:
-        return sorted_vals[f]
-    return sorted_vals[f] + (sorted_vals[c] - sorted_vals[f]) * (k - f)
-
-
 def _wilson(successes, total, z=1.959963984540054):
     if total <= 0:
         return [None, None]
@@ -79,29 +68,72 @@ def _wilson(successes, total, z=1.959963984540054):
 
 
 def latency_stats(conn, run_id):
-    out = {}
+    # One pass over the run: PostgreSQL drops each framework's warm-up rows and
+    # computes the percentiles (percentile_cont interpolates linearly between
+    # ranks, as the old in-Python helper did), so only four summary rows come back.
     with conn.cursor() as cur:
-        for fw in FRAMEWORKS:
-            cur.execute("""
-                SELECT processing_time_ms FROM zta.framework_comparison
-                WHERE framework_type = %s AND comparison_id = %s ORDER BY id
-            """, (fw, run_id))
-            vals = [r["processing_time_ms"] for r in cur.fetchall()]
-            skip = WARMUP_N
-            # A cold-start artifact (e.g. ES shard allocation after a container
-            # rebuild) can inflate a long prefix beyond the standard warm-up
-            # window — inspect the raw sequence before trusting this blindly.
-            warm = sorted(vals[skip:]) if len(vals) > skip else sorted(vals)
-            out[fw] = {
-                "n": len(warm),
-                "avg_ms": round(sum(warm) / len(warm), 1) if warm else None,
-                "median_ms": round(median(warm), 1) if warm else None,
-                "p95_ms": round(_percentile(warm, 0.95), 1) if warm else None,
-                "p99_ms": round(_percentile(warm, 0.99), 1) if warm else None,
-            }
+        cur.execute("""
+            WITH ordered AS (
+                SELECT framework_type, processing_time_ms,
+                       row_number() OVER (PARTITION BY framework_type ORDER BY id) AS rn,
+                       count(*) OVER (PARTITION BY framework_type) AS total
+                FROM zta.framework_comparison
+                WHERE framework_type = ANY(%(fws)s) AND comparison_id = %(run_id)s
+            )
+            SELECT framework_type,
+                   count(*) AS n,
+                   avg(processing_time_ms)::float8 AS avg_ms,
+                   percentile_cont(0.50) WITHIN GROUP (ORDER BY processing_time_ms) AS median_ms,
+                   percentile_cont(0.95) WITHIN GROUP (ORDER BY processing_time_ms) AS p95_ms,
+                   percentile_cont(0.99) WITHIN GROUP (ORDER BY processing_time_ms) AS p99_ms
+            FROM ordered
+            -- A cold-start artifact (e.g. ES shard allocation after a container
+            -- rebuild) can inflate a long prefix beyond the standard warm-up
+            -- window — inspect the raw sequence before trusting this blindly.
+            WHERE rn > %(skip)s OR total <= %(skip)s
+            GROUP BY framework_type
+        """, {"fws": FRAMEWORKS, "run_id": run_id, "skip": WARMUP_N})
+        rows = {r["framework_type"]: r for r in cur.fetchall()}
+    out = {}
+    for fw in FRAMEWORKS:
+        r = rows.get(fw)
+        out[fw] = {
+            "n": r["n"] if r else 0,
+            "avg_ms": round(r["avg_ms"], 1) if r else None,
+            "median_ms": round(r["median_ms"], 1) if r else None,
+            "p95_ms": round(r["p95_ms"], 1) if r else None,
+            "p99_ms": round(r["p99_ms"], 1) if r else None,
+        }
     return out
 
 
+def sla_censoring(conn, run_id):
+    """Samples the simulator dropped for exceeding its SLA timeout. They never
+    reach framework_comparison, so the latency percentiles above are computed
+    without them — report the count so that censoring is visible."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('zta.sla_timeouts') IS NOT NULL AS present")
+        if not cur.fetchone()["present"]:
+            return None
+        cur.execute("""
+            SELECT COUNT(*) AS n, MAX(sla_timeout_s)::float8 AS sla_timeout_s
+            FROM zta.sla_timeouts WHERE comparison_id = %s
+        """, (run_id,))
+        totals = cur.fetchone()
+        cur.execute("""
+            SELECT fw, COUNT(*) AS n
+            FROM zta.sla_timeouts, jsonb_array_elements_text(timed_out_frameworks) AS fw
+            WHERE comparison_id = %s
+            GROUP BY fw
+        """, (run_id,))
+        by_fw = {r["fw"]: r["n"] for r in cur.fetchall()}
+    return {
+        "timed_out_samples": totals["n"],
+        "sla_timeout_s": totals["sla_timeout_s"],
+        "timed_out_by_framework": {fw: by_fw.get(fw, 0) for fw in FRAMEWORKS},
+    }
+
+
 def decision_distribution(conn, run_id):
     out = {}
     with conn.cursor() as cur:
@@ -353,6 +385,7 @@ def main():
         result = {
             "comparison_id": run_id,
             "latency": latency_stats(conn, run_id),
+            "latency_sla_censoring": sla_censoring(conn, run_id),
             "decisions": decision_distribution(conn, run_id),
             "usability_benign_only": usability_benign_only(conn, run_id),
             "security_accuracy": security_accuracy(conn, run_id),
@@ -28,6 +28,7 @@ CONFIG_KEYS = [
     "SIM_GPS_OFFSET_KM", "SIM_PCT_SPOOFING", "SIM_RBA_SPOOF_PCT",
     "SIM_PCT_TLS_TAMPERING", "SIM_PCT_DOS", "SIM_PCT_EXFIL", "SIM_EXFIL_MODE",
     "SIM_PCT_EOP", "SIM_PCT_REPUDIATION", "SIM_PCT_BENIGN",
+    "SIM_SLA_TIMEOUT_S",
 ]
 
 CONFIG_DEFAULTS = {
@@ -37,6 +38,7 @@ CONFIG_DEFAULTS = {
     "DEVICE_TLS_MISMATCH_PENALTY": "0.4",
     "DEVICE_FRESHNESS_WINDOW_DAYS": "30",
     "SIM_RANDOM_SEED": "20260720",
+    "SIM_SLA_TIMEOUT_S": "45",
 }
 
 ARTIFACTS = [
@@ -13,6 +13,7 @@ vars set before each configuration's pass (this script restarts the
 validation container itself between configs).
 """
 import asyncio, json, os, subprocess, sys
+from collections import Counter
 import httpx
 from sqlalchemy import create_engine, text
 
@@ -116,10 +117,12 @@ async def run_config(all_signals):
     async with httpx.AsyncClient() as client:
         results = await asyncio.gather(*[replay_one(client, s, sem) for s in all_signals])
     results = [r for r in results if r is not None]
-    tp = sum(1 for m, p in results if m and p)
-    fn = sum(1 for m, p in results if m and not p)
-    fp = sum(1 for m, p in results if not m and p)
-    tn = sum(1 for m, p in results if not m and not p)
+    # Confusion matrix in one pass, keyed by (is_malicious, predicted_malicious)
+    counts = Counter(results)
+    tp = counts[(True, True)]
+    fn = counts[(True, False)]
+    fp = counts[(False, True)]
+    tn = counts[(False, False)]
     tpr = tp / max(1, tp + fn)
     fpr = fp / max(1, fp + tn)
     precision = tp / max(1, tp + fp)
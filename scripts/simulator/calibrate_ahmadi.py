@@ -12,7 +12,8 @@ import statistics
 import sys
 from datetime import datetime
 
-sys.path.insert(0, "/app/scripts/simulator")
+if "/app/scripts/simulator" not in sys.path:
+    sys.path.insert(0, "/app/scripts/simulator")
 from enhanced_sim import EnhancedSimulator  # noqa: E402
 
 
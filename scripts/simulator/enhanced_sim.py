@@ -5,10 +5,14 @@ Based on original sim.py but adds baseline framework comparison
 Uses proper STRIDE classification and full data complexity
 """
 import os, sys, csv, json, random, time, uuid
+from bisect import bisect_left
+from itertools import accumulate
+from dataclasses import dataclass
 from typing import Dict, Any, Optional
 import httpx
 import asyncio
 from sqlalchemy import create_engine, text
+from psycopg.types.json import Jsonb
 
 from country_centroids import COUNTRY_CENTROIDS
 from data_split import split_bucket, is_split_file
@@ -37,6 +41,9 @@ MAX_ROWS      = int(os.getenv("SIM_MAX_ROWS", "400"))
 MAX_PER_FILE  = int(os.getenv("SIM_MAX_PER_FILE", "600"))
 # For 24-hour simulation: 24h * 3600s/h / 1s sleep = 86400 samples
 MAX_24H_SAMPLES = int(os.getenv("SIM_24H_SAMPLES", "86400"))
+# Per-sample deadline across all frameworks; anything still running past it is
+# cancelled and the sample is counted as timed out rather than persisted.
+SLA_TIMEOUT_S = float(os.getenv("SIM_SLA_TIMEOUT_S", "45"))
 BENIGN_KEEP   = float(os.getenv("SIM_BENIGN_KEEP", "0.10"))
 USE_GPS_FROM_WIFI = os.getenv("SIM_USE_GPS_FROM_WIFI","true").lower() in {"1","true","yes","on"}
 
@@ -54,6 +61,11 @@ GPS_OFFSET_KM = float(os.getenv("SIM_GPS_OFFSET_KM","600"))
 HOME_BSSIDS = {"00:11:22:33:44:55", "00:11:22:33:44:66"}
 HOME_BSSID_PCT = float(os.getenv("SIM_HOME_BSSID_PCT", "0.85"))
 
+# JA3 tags the validation service treats as critical (its CRIT_TLS set); bad
+# fingerprints are down-weighted in normal TLS draws.
+TLS_BAD_TAGS = frozenset({"tor_suspect", "malware_family_x", "scanner_tool",
+                          "cloud_proxy", "old_openssl", "insecure_client", "honeypot_fingerprint"})
+
 # STRIDE class mix, normalized to sum to 1.0 with P_BENIGN. P_BENIGN reserves
 # an explicit no-scenario path that keeps the real CIC-IDS2018 label untouched.
 P_SPOOF   = float(os.getenv("SIM_PCT_SPOOFING","0.15"))
@@ -76,6 +88,12 @@ RBA_SPOOF_PCT = float(os.getenv("SIM_RBA_SPOOF_PCT", "0.5"))
 # real native credential-stuffing row rather than a synthetic injection.
 CREDENTIAL_NATIVE_PCT = float(os.getenv("SIM_CREDENTIAL_NATIVE_PCT", "0.3"))
 
+# STRIDE buckets drawn from real CIC-IDS2018 rows -> their native pool.
+NATIVE_POOL_FOR_BUCKET = {"dos": "dos_native", "exfil": "exfil_native", "eop": "eop_native"}
+
+# Frameworks compared per sample, in the order run_simulation creates the tasks.
+FRAMEWORK_LABELS = ("proposed", "ablation", "ahmadi2025", "phani2025")
+
 # Fixes session sampling, signal presence, and scenario injection for reproducibility.
 SIM_RANDOM_SEED = int(os.getenv("SIM_RANDOM_SEED", "20260720"))
 random.seed(SIM_RANDOM_SEED)
@@ -103,12 +121,50 @@ NETWORK_FLOW_FEATURES = [
     "Active Max", "Active Min", "Idle Mean", "Idle Std", "Idle Max", "Idle Min",
 ]
 
+# Per-sample INSERTs, built once at import rather than re-parsed by text() on
+# every _store_comparison_data call
+_INSERT_FRAMEWORK_COMPARISON = text("""
+    INSERT INTO zta.framework_comparison
+    (comparison_id, framework_type, session_id, decision, risk_score,
+     enforcement, factors, processing_time_ms)
+    VALUES (:comp_id, :framework, :session_id, :decision, :risk_score,
+            :enforcement, :factors, :processing_time)
+""")
+_INSERT_SECURITY_CLASSIFICATION = text("""
+    INSERT INTO zta.security_classifications
+    (session_id, original_label, predicted_threats, framework_type,
+     false_positive, false_negative)
+    VALUES (:session_id, :original_label, :predicted_threats, :framework,
+            :false_positive, :false_negative)
+""")
+_INSERT_SLA_TIMEOUT = text("""
+    INSERT INTO zta.sla_timeouts
+    (comparison_id, session_id, original_label, timed_out_frameworks, sla_timeout_s)
+    VALUES (:comp_id, :session_id, :original_label, :frameworks, :sla_timeout_s)
+""")
+
+@dataclass(slots=True, frozen=True)
+class FrameworkResult:
+    """One framework's decision for one session. Slotted and frozen — a
+    24-hour run produces one of these per framework per sample, so there is
+    no per-instance __dict__ and nothing mutates a result once returned."""
+    framework: str
+    session_id: str
+    decision: str
+    risk_score: float
+    enforcement: str
+    factors: Any
+    processing_time_ms: int
+    full_response: Dict[str, Any]
+
+
 class EnhancedSimulator:
     """Enhanced simulator matching original sim.py logic with baseline comparison"""
 
     def __init__(self):
         self.wifi_pool = []
         self.tls_pool = []
+        self._tls_tables_cache = None
         self.dev_pool = []
         self.cic2018_rows = []
         self.native_pools = {}
@@ -116,6 +172,8 @@ class EnhancedSimulator:
         self.rba_attack_rows = []
         self.rba_benign_rows = []
         self.stride_buckets = []
+        self._stride_edges = []
+        self._stride_keys = []
         self.engine = None
         self._init_database()
         self._load_data()
@@ -375,6 +433,16 @@ class EnhancedSimulator:
             acc += p / total
             cum.append((acc, k))
         self.stride_buckets = cum
+        self._stride_edges = [edge for edge, _ in cum]
+        self._stride_keys = [k for _, k in cum]
+
+    def _pick_stride_bucket(self) -> str:
+        """Draw a STRIDE bucket from the cumulative mix: the first bucket whose
+        edge is >= r, found by binary search instead of a linear scan."""
+        r = random.random()
+        i = bisect_left(self._stride_edges, r)
+        # Float rounding can leave the last edge a hair under 1.0
+        return self._stride_keys[i] if i < len(self._stride_keys) else "spoof"
 
     def _get_src_ip(self, row: Dict[str, Any]) -> Optional[str]:
         """Extract source IP from CIC-IDS2018 row"""
@@ -405,27 +473,32 @@ class EnhancedSimulator:
         if not pool:
             return None
 
-        badtags = {"tor_suspect", "malware_family_x", "scanner_tool",
-                  "cloud_proxy", "old_openssl", "insecure_client", "honeypot_fingerprint"}
+        bad, clean, cum_weights = self._tls_tables(pool)
 
         if bad_only:
-            bad = [r for r in pool if (r.get("tag") or r.get("Tag") or "").strip().lower() in badtags]
             return random.choice(bad) if bad else None
 
         if clean_only:
-            clean = [r for r in pool if (r.get("tag") or r.get("Tag") or "").strip().lower() not in badtags]
             return random.choice(clean) if clean else None
 
-        weights = []
-        for r in pool:
-            tag = (r.get("tag") or r.get("Tag") or "").strip().lower()
-            weights.append(0.2 if tag in badtags else 1.0)
-
         try:
-            return random.choices(pool, weights=weights, k=1)[0]
+            return random.choices(pool, cum_weights=cum_weights, k=1)[0]
         except:
             return random.choice(pool)
 
+    def _tls_tables(self, pool):
+        """Bad/clean split and cumulative draw weights for a TLS pool, built once
+        per pool instead of re-scanning every row's tag on each pick. Same draws
+        as passing weights= each time, so seeded runs are unchanged."""
+        key = (id(pool), len(pool))
+        if self._tls_tables_cache is None or self._tls_tables_cache[0] != key:
+            tags = [(r.get("tag") or r.get("Tag") or "").strip().lower() for r in pool]
+            bad = [r for r, t in zip(pool, tags) if t in TLS_BAD_TAGS]
+            clean = [r for r, t in zip(pool, tags) if t not in TLS_BAD_TAGS]
+            cum_weights = list(accumulate(0.2 if t in TLS_BAD_TAGS else 1.0 for t in tags))
+            self._tls_tables_cache = (key, bad, clean, cum_weights)
+        return self._tls_tables_cache[1:]
+
     def _pick_wifi_row(self, force_foreign: bool = False):
         """Pick a WiFi AP, weighting toward the user's known home cluster for
         normal traffic so location_risk carries real signal (see HOME_BSSIDS)."""
@@ -605,7 +678,12 @@ class EnhancedSimulator:
             pass
 
     async def _call_proposed_framework(self, client, sig):
-        """Call proposed framework (validation -> gateway)"""
+        """Call proposed framework (validation -> gateway).
+
+        The two hops are strictly sequential: the gateway decides on the
+        validation service's `validated` output, so there is nothing to issue
+        concurrently. Both go over the shared client's kept-alive connections,
+        and the other frameworks already run alongside this call."""
         try:
             start_time = time.perf_counter()
 
@@ -632,16 +710,16 @@ class EnhancedSimulator:
 
             print(f"[PROPOSED] Decision for {sig['session_id']}: {decision} (risk={risk_score}, factors={factors})")
 
-            return {
-                "framework": "proposed",
-                "session_id": sig["session_id"],
-                "decision": decision,
-                "risk_score": risk_score,
-                "enforcement": enforcement,
-                "factors": factors,
-                "processing_time_ms": processing_time_ms,
-                "full_response": decision_data
-            }
+            return FrameworkResult(
+                framework="proposed",
+                session_id=sig["session_id"],
+                decision=decision,
+                risk_score=risk_score,
+                enforcement=enforcement,
+                factors=factors,
+                processing_time_ms=processing_time_ms,
+                full_response=decision_data
+            )
         except httpx.HTTPStatusError as e:
             print(f"[PROPOSED] HTTP Error for {sig['session_id']}: {e.response.status_code} - {e.response.text}")
             return None
@@ -672,16 +750,16 @@ class EnhancedSimulator:
 
             print(f"[ABLATION] Decision for {sig['session_id']}: {decision_val} (risk={risk_score}, factors={factors})")
 
-            return {
-                "framework": "ablation",
-                "session_id": sig["session_id"],
-                "decision": decision_val,
-                "risk_score": risk_score,
-                "enforcement": enforcement,
-                "factors": factors,
-                "processing_time_ms": processing_time_ms,
-                "full_response": decision
-            }
+            return FrameworkResult(
+                framework="ablation",
+                session_id=sig["session_id"],
+                decision=decision_val,
+                risk_score=risk_score,
+                enforcement=enforcement,
+                factors=factors,
+                processing_time_ms=processing_time_ms,
+                full_response=decision
+            )
         except httpx.HTTPStatusError as e:
             print(f"[ABLATION] HTTP Error for {sig['session_id']}: {e.response.status_code} - {e.response.text}")
             return None
@@ -705,22 +783,22 @@ class EnhancedSimulator:
             enforcement  = decision.get("enforcement", "ALLOW")
             factors      = decision.get("factors", {})
             print(f"[{tag.upper()}] {sig['session_id']}: {decision_val} (risk={risk_score:.3f})")
-            return {
-                "framework":          tag,
-                "session_id":         sig["session_id"],
-                "decision":           decision_val,
-                "risk_score":         risk_score,
-                "enforcement":        enforcement,
-                "factors":            factors,
-                "processing_time_ms": processing_time_ms,
-                "full_response":      decision,
-            }
+            return FrameworkResult(
+                framework=tag,
+                session_id=sig["session_id"],
+                decision=decision_val,
+                risk_score=risk_score,
+                enforcement=enforcement,
+                factors=factors,
+                processing_time_ms=processing_time_ms,
+                full_response=decision,
+            )
         except Exception as e:
             print(f"[{tag.upper()}] Error for {sig['session_id']}: {e}")
             return None
 
-    def _store_comparison_data(self, comparison_id: str, proposed_result: Optional[Dict[str, Any]] = None,
-                              baseline_result: Optional[Dict[str, Any]] = None, signal: Optional[Dict[str, Any]] = None,
+    def _store_comparison_data(self, comparison_id: str, proposed_result: Optional[FrameworkResult] = None,
+                              baseline_result: Optional[FrameworkResult] = None, signal: Optional[Dict[str, Any]] = None,
                               extra_results: Optional[list] = None):
         """Store comparison data in database using validation service pattern.
 
@@ -733,20 +811,20 @@ class EnhancedSimulator:
             return
 
         all_results = [proposed_result, baseline_result] + (extra_results or [])
-        valid_results = [r for r in all_results if r and isinstance(r, dict)
-                          and r.get("framework") and r.get("decision") != "unknown"]
+        valid_results = [r for r in all_results if isinstance(r, FrameworkResult)
+                          and r.framework and r.decision != "unknown"]
         if not valid_results:
             return
 
         comparison_rows = [{
             "comp_id": comparison_id,
-            "framework": r["framework"],
-            "session_id": r["session_id"],
-            "decision": r["decision"],
-            "risk_score": float(r.get("risk_score", 0.0)),
-            "enforcement": r.get("enforcement", "ALLOW"),
-            "factors": json.dumps(r.get("factors", [])),
-            "processing_time": r.get("processing_time_ms", 0)
+            "framework": r.framework,
+            "session_id": r.session_id,
+            "decision": r.decision,
+            "risk_score": float(r.risk_score),
+            "enforcement": r.enforcement,
+            "factors": Jsonb(r.factors),
+            "processing_time": r.processing_time_ms
         } for r in valid_results]
 
         classification_rows = []
@@ -754,45 +832,55 @@ class EnhancedSimulator:
             ground_truth = signal.get("label", "BENIGN")
             is_malicious_actual = ground_truth.upper() != "BENIGN"
             for r in valid_results:
-                predicted_threats = r.get("factors", []) if isinstance(r.get("factors"), list) else []
+                predicted_threats = r.factors if isinstance(r.factors, list) else []
                 # Ground truth vs. the framework's actual enforcement decision
                 # (consistent across all frameworks: allow/step_up/deny).
-                has_threats_predicted = r.get("decision") in ("step_up", "deny")
+                has_threats_predicted = r.decision in ("step_up", "deny")
                 classification_rows.append({
-                    "session_id": r["session_id"],
+                    "session_id": r.session_id,
                     "original_label": ground_truth,
-                    "predicted_threats": json.dumps(predicted_threats),
-                    "framework": r["framework"],
+                    "predicted_threats": Jsonb(predicted_threats),
+                    "framework": r.framework,
                     "false_positive": not is_malicious_actual and has_threats_predicted,
                     "false_negative": is_malicious_actual and not has_threats_predicted
                 })
 
         try:
             with eng.begin() as conn:
-                conn.execute(text("""
-                    INSERT INTO zta.framework_comparison
-                    (comparison_id, framework_type, session_id, decision, risk_score,
-                     enforcement, factors, processing_time_ms)
-                    VALUES (:comp_id, :framework, :session_id, :decision, :risk_score,
-                            :enforcement, :factors, :processing_time)
-                """), comparison_rows)
+                conn.execute(_INSERT_FRAMEWORK_COMPARISON, comparison_rows)
 
                 if classification_rows:
-                    conn.execute(text("""
-                        INSERT INTO zta.security_classifications
-                        (session_id, original_label, predicted_threats, framework_type,
-                         false_positive, false_negative)
-                        VALUES (:session_id, :original_label, :predicted_threats, :framework,
-                                :false_positive, :false_negative)
-                    """), classification_rows)
+                    conn.execute(_INSERT_SECURITY_CLASSIFICATION, classification_rows)
 
             for r in valid_results:
-                print(f"[DB] Stored {r['framework']} framework data: {r['decision']}")
+                print(f"[DB] Stored {r.framework} framework data: {r.decision}")
         except Exception as e:
             print(f"[DB] Failed to store comparison data: {e}")
 
-    async def run_simulation(self, max_samples: Optional[int] = None, sleep_time: Optional[float] = None):
-        """Run enhanced simulation with STRIDE scenarios"""
+    def _store_timeout(self, comparison_id: str, signal: Dict[str, Any], late: list):
+        """Record a sample dropped for exceeding the SLA so the latency figures
+        can report how much of the run was censored."""
+        eng = self._get_engine()
+        if eng is None:
+            return
+        try:
+            with eng.begin() as conn:
+                conn.execute(_INSERT_SLA_TIMEOUT, {
+                    "comp_id": comparison_id,
+                    "session_id": signal.get("session_id", "unknown"),
+                    "original_label": signal.get("label", "BENIGN"),
+                    "frameworks": Jsonb(late),
+                    "sla_timeout_s": SLA_TIMEOUT_S,
+                })
+        except Exception as e:
+            print(f"[DB] Failed to store SLA timeout: {e}")
+
+    async def run_simulation(self, max_samples: Optional[int] = None, sleep_time: Optional[float] = None,
+                             client: Optional[httpx.AsyncClient] = None):
+        """Run enhanced simulation with STRIDE scenarios.
+
+        Pass `client` to reuse one connection pool across batches (see
+        start_simulation.py); otherwise a client is opened for this run only."""
         if max_samples is None:
             max_samples = MAX_ROWS
         if sleep_time is None:
@@ -804,7 +892,8 @@ class EnhancedSimulator:
 
         if not self.cic2018_rows:
             print("[SIM] No CIC-IDS2018 data available")
-            return {"comparison_id": None, "total_samples": 0, "successful_comparisons": 0}
+            return {"comparison_id": None, "total_samples": 0, "successful_comparisons": 0,
+                    "timed_out_comparisons": 0}
 
         print(f"[SIM] pools: wifi={len(self.wifi_pool)} tls={len(self.tls_pool)} device={len(self.dev_pool)}")
         print(f"[SIM] Starting enhanced simulation with {max_samples} samples")
@@ -817,8 +906,12 @@ class EnhancedSimulator:
         comparison_id = os.getenv("SIM_COMPARISON_ID") or f"comp-{uuid.uuid4().hex}"
         sent = 0
         successful_comparisons = 0
+        timed_out_comparisons = 0
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        owns_client = client is None
+        if owns_client:
+            client = httpx.AsyncClient(timeout=60.0)
+        try:
             while sent < max_samples:
                 try:
                     # Assign STRIDE bucket first, then pick the row it needs. A "dos"
@@ -826,20 +919,14 @@ class EnhancedSimulator:
                     # label; only bucket="spoof"/"tls"/"rep" construct a synthetic
                     # scenario on top of a genuinely Benign row, since CIC-IDS2018 has
                     # no native representation for those three categories.
-                    r = random.random()
-                    bucket = "spoof"
-                    for edge, k in self.stride_buckets:
-                        if r <= edge:
-                            bucket = k
-                            break
+                    bucket = self._pick_stride_bucket()
 
                     row = None
                     native_passthrough = False
                     force_foreign = False
 
                     if bucket in ("dos", "eop") or (bucket == "exfil" and EXFIL_MODE == "native"):
-                        pool_name = {"dos": "dos_native", "exfil": "exfil_native", "eop": "eop_native"}[bucket]
-                        pool = self.native_pools.get(pool_name) or []
+                        pool = self.native_pools.get(NATIVE_POOL_FOR_BUCKET[bucket]) or []
                         if pool:
                             row = random.choice(pool)
                             native_passthrough = True
@@ -887,24 +974,34 @@ class EnhancedSimulator:
                     print(f"[SIM] Processing sample {sent+1}/{max_samples} - {sig['session_id']} (bucket: {tag})")
 
                     # Jimmy (2025) excluded — no published risk-scoring formula to reproduce.
-                    results = await asyncio.gather(
-                        self._call_proposed_framework(client, sig),
-                        self._call_baseline_framework(client, sig),
-                        self._call_generic_baseline(client, sig, AHMADI_URL, "ahmadi2025"),
-                        self._call_generic_baseline(client, sig, PHANI_URL,  "phani2025"),
-                        return_exceptions=True
-                    )
-
-                    proposed_result: Optional[Dict[str, Any]] = None
-                    baseline_result: Optional[Dict[str, Any]] = None
+                    tasks = [
+                        asyncio.create_task(self._call_proposed_framework(client, sig)),
+                        asyncio.create_task(self._call_baseline_framework(client, sig)),
+                        asyncio.create_task(self._call_generic_baseline(client, sig, AHMADI_URL, "ahmadi2025")),
+                        asyncio.create_task(self._call_generic_baseline(client, sig, PHANI_URL,  "phani2025")),
+                    ]
+                    # Bounded by SLA_TIMEOUT_S rather than the slowest framework's
+                    # tail latency: laggards are cancelled so a known-slow service
+                    # can't hold the loop, and the sample lands in its own bucket.
+                    done, pending = await asyncio.wait(tasks, timeout=SLA_TIMEOUT_S)
+                    for t in pending:
+                        t.cancel()
+                    if pending:
+                        await asyncio.gather(*pending, return_exceptions=True)
+                    results = [
+                        (t.exception() or t.result()) if t in done else None
+                        for t in tasks
+                    ]
+
+                    proposed_result: Optional[FrameworkResult] = None
+                    baseline_result: Optional[FrameworkResult] = None
                     extra_results: list = []
 
                     # Handle exceptions and type-safe assignment
-                    labels = ["proposed", "ablation", "ahmadi2025", "phani2025"]
-                    for i, (label, res) in enumerate(zip(labels, results)):
+                    for i, (label, res) in enumerate(zip(FRAMEWORK_LABELS, results)):
                         if isinstance(res, Exception):
                             print(f"[SIM] {label} error: {res}")
-                        elif isinstance(res, dict):
+                        elif isinstance(res, FrameworkResult):
                             if i == 0:
                                 proposed_result = res
                             elif i == 1:
@@ -917,12 +1014,21 @@ class EnhancedSimulator:
                         and baseline_result is not None
                         and len(extra_results) == 2
                     )
-                    if complete_pair:
-                        self._store_comparison_data(comparison_id, proposed_result, baseline_result, sig, extra_results)
+                    if pending:
+                        timed_out_comparisons += 1
+                        late = [label for label, t in zip(FRAMEWORK_LABELS, tasks) if t in pending]
+                        print(f"[SIM]   Exceeded {SLA_TIMEOUT_S:.0f}s SLA for {sig.get('session_id', 'unknown')} "
+                              f"(timed out: {', '.join(late)}); recorded in zta.sla_timeouts")
+                        await asyncio.to_thread(self._store_timeout, comparison_id, sig, late)
+                    elif complete_pair:
+                        # Synchronous SQLAlchemy write; run it in a worker thread so the
+                        # event loop (and any in-flight client connections) isn't blocked
+                        await asyncio.to_thread(self._store_comparison_data, comparison_id,
+                                                proposed_result, baseline_result, sig, extra_results)
                         successful_comparisons += 1
-                        for label, res in zip(labels, results):
-                            if isinstance(res, dict):
-                                print(f"[SIM]   {label:12s}: {res.get('decision','?'):8s} risk={res.get('risk_score',0):.3f}")
+                        for label, res in zip(FRAMEWORK_LABELS, results):
+                            if isinstance(res, FrameworkResult):
+                                print(f"[SIM]   {label:12s}: {res.decision:8s} risk={res.risk_score:.3f}")
                     else:
                         print(f"[SIM]   Incomplete framework quartet for {sig.get('session_id', 'unknown')}; not persisted")
 
@@ -937,15 +1043,20 @@ class EnhancedSimulator:
                     print(f"[SIM] Unexpected error for sample {sent+1}: {e}")
                     sent += 1
                     continue
+        finally:
+            if owns_client:
+                await client.aclose()
 
         print("[SIM] Simulation completed!")
         print(f"[SIM] Successful comparisons: {successful_comparisons}/{sent}")
+        print(f"[SIM] Timed out (past SLA): {timed_out_comparisons}/{sent}")
         print(f"[SIM] Comparison ID: {comparison_id}")
 
         return {
             "comparison_id": comparison_id,
             "total_samples": sent,
-            "successful_comparisons": successful_comparisons
+            "successful_comparisons": successful_comparisons,
+            "timed_out_comparisons": timed_out_comparisons
         }
 
 
@@ -974,9 +1085,18 @@ async def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        # Close the pre-warmed pool rather than leaving it to interpreter teardown
+        if simulator.engine is not None:
+            simulator.engine.dispose()
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
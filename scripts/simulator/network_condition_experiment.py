@@ -30,7 +30,9 @@ from typing import Dict, Any, Optional
 import httpx
 import psycopg
 
-sys.path.insert(0, os.path.dirname(__file__))
+_SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+if _SIM_DIR not in sys.path:
+    sys.path.insert(0, _SIM_DIR)
 from enhanced_sim import EnhancedSimulator, VALIDATE_URL, GATEWAY_URL, DB_DSN
 
 SAMPLES_PER_CONDITION = int(os.getenv("NET_EXP_SAMPLES", "150"))
@@ -96,21 +98,27 @@ def _store_results(condition_name: str, results: list, baseline_throughput: Opti
     if dsn.startswith("postgresql+psycopg://"):
         dsn = "postgresql://" + dsn[len("postgresql+psycopg://"):]
     try:
-        with psycopg.connect(dsn, connect_timeout=15, prepare_threshold=None, autocommit=True) as conn:
+        # Single transaction, committed when the connection block exits
+        with psycopg.connect(dsn, connect_timeout=15, prepare_threshold=None) as conn:
             with conn.cursor() as cur:
-                cur.executemany(
-                    """INSERT INTO zta.network_latency_simulation
+                # Re-runnable measurement rows; don't wait on the WAL flush at COMMIT
+                cur.execute("SET LOCAL synchronous_commit = off")
+                # COPY streams the whole condition in one statement rather than
+                # one INSERT per session
+                with cur.copy(
+                    """COPY zta.network_latency_simulation
                        (network_condition, framework_type, decision_latency_ms, throughput_impact_pct)
-                       VALUES (%s, 'proposed', %s, %s)""",
-                    [(condition_name, r["latency_ms"], throughput_impact_pct) for r in results]
-                )
+                       FROM STDIN"""
+                ) as copy:
+                    for r in results:
+                        copy.write_row((condition_name, "proposed", r["latency_ms"], throughput_impact_pct))
     except Exception as e:
         print(f"[NET-EXP] Failed to store results for {condition_name}: {e}")
 
     return throughput
 
 
-async def run():
+async def run(samples_per_condition: int = SAMPLES_PER_CONDITION):
     sim = EnhancedSimulator()  # __init__ already loads CIC-IDS2018 data
     if not sim.cic2018_rows:
         print("[NET-EXP] No CIC-IDS2018 data available — aborting")
@@ -142,19 +150,14 @@ async def run():
             results = []
             tp = fp = tn = fn = 0
 
-            for i in range(SAMPLES_PER_CONDITION):
+            for i in range(samples_per_condition):
                 row = row_pool[i % len(row_pool)]
                 wifi_row = random.choice(sim.wifi_pool) if sim.wifi_pool else None
                 tls_row = sim._pick_tls_row(sim.tls_pool, bad_only=False) if sim.tls_pool else None
                 dev_row = random.choice(sim.dev_pool) if sim.dev_pool else None
 
                 sig = sim._mk_signals(row, wifi_row, tls_row, dev_row)
-                r = random.random()
-                bucket = "spoof"
-                for edge, k in sim.stride_buckets:
-                    if r <= edge:
-                        bucket = k
-                        break
+                bucket = sim._pick_stride_bucket()
                 sim._apply_stride_scenario(sig, bucket)
                 sim._ensure_floors(sig)
                 sig["session_id"] = f"net-{condition['name']}-{i}-{int(time.time()*1000)}"
@@ -174,9 +177,10 @@ async def run():
                         tn += 1
 
                 if (i + 1) % 25 == 0:
-                    print(f"[NET-EXP]   {i+1}/{SAMPLES_PER_CONDITION} samples done")
+                    print(f"[NET-EXP]   {i+1}/{samples_per_condition} samples done")
 
-            throughput = _store_results(condition["name"], results, baseline_throughput)
+            # Blocking psycopg write; keep it off the event loop
+            throughput = await asyncio.to_thread(_store_results, condition["name"], results, baseline_throughput)
             if condition["name"] == "normal":
                 baseline_throughput = throughput
 
@@ -201,4 +205,11 @@ async def run():
 
 
 if __name__ == "__main__":
-    asyncio.run(run())
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Network condition sensitivity experiment")
+    parser.add_argument("--samples", type=int, default=SAMPLES_PER_CONDITION,
+                        help="Sessions per network condition (default: NET_EXP_SAMPLES or 150)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.samples))
@@ -24,7 +24,9 @@ import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import precision_score, f1_score, roc_auc_score, roc_curve
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "simulator"))
+_SIM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simulator")
+if _SIM_DIR not in sys.path:
+    sys.path.insert(0, _SIM_DIR)
 from data_split import split_bucket  # noqa: E402
 
 DATA_DIR = os.environ.get("CIC2018_DIR", "datasets/cic2018")
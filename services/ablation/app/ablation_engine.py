@@ -22,7 +22,7 @@ Ablation still gets, since none of it needs enrichment:
 
 import os
 import time
-import random
+import uuid
 from typing import Dict, Any, Tuple
 import logging
 
@@ -163,7 +163,8 @@ class BaselineDecisionEngine:
         """Process raw signals with the validation layer and quality scoring removed."""
         start_time = time.perf_counter()
 
-        session_id = raw_signals.get('session_id', f'baseline-{int(time.time())}-{random.randint(1000, 9999)}')
+        # uuid4 like the simulator's own ids; the old time+4-digit suffix collided under load
+        session_id = raw_signals.get('session_id') or f'baseline-{uuid.uuid4().hex[:12]}'
 
         risk_score, risk_factors = self._calculate_risk(raw_signals)
 
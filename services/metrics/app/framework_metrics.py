@@ -109,7 +109,7 @@ class ThesisMetricsCalculator:
             query = text("""
                 SELECT framework_type, original_label, false_positive, false_negative
                 FROM zta.security_classifications
-                WHERE created_at > NOW() - INTERVAL :hours HOUR
+                WHERE created_at > NOW() - make_interval(hours => :hours)
             """)
 
             results = conn.execute(query, {"hours": hours}).mappings().all()
@@ -157,7 +157,7 @@ class ThesisMetricsCalculator:
                     END as outcome,
                     COUNT(*) as count
                 FROM zta.framework_comparison
-                WHERE created_at > NOW() - INTERVAL :hours HOUR
+                WHERE created_at > NOW() - make_interval(hours => :hours)
                 GROUP BY framework_type, outcome
             """), {"hours": hours}).mappings().all()
 
@@ -179,9 +179,9 @@ class ThesisMetricsCalculator:
                     AVG(processing_time_ms) as avg_latency,
                     PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY processing_time_ms) as p95_latency,
                     PERCENTILE_CONT(0.99) WITHIN GROUP (ORDER BY processing_time_ms) as p99_latency,
-                    COUNT(*) / NULLIF(EXTRACT(EPOCH FROM INTERVAL :hours HOUR) / 3600.0, 0) as throughput_rph
+                    COUNT(*) / NULLIF(CAST(:hours AS numeric), 0) as throughput_rph
                 FROM zta.framework_comparison
-                WHERE created_at > NOW() - INTERVAL :hours HOUR
+                WHERE created_at > NOW() - make_interval(hours => :hours)
                 GROUP BY framework_type
             """), {"hours": hours}).mappings().all()
 
@@ -198,6 +198,26 @@ class ThesisMetricsCalculator:
                 )
             return metrics
 
+    def calculate_latency_significance(self, hours: int = 24) -> Dict[str, Dict[str, Any]]:
+        """Compare the proposed framework's decision latency against each baseline:
+        t-test, Hedges' g and a bootstrap CI on the difference in means."""
+        with self.engine.connect() as conn:
+            results = conn.execute(text("""
+                SELECT framework_type, array_agg(processing_time_ms) as latencies
+                FROM zta.framework_comparison
+                WHERE created_at > NOW() - make_interval(hours => :hours)
+                  AND processing_time_ms IS NOT NULL
+                GROUP BY framework_type
+            """), {"hours": hours}).mappings().all()
+
+        latencies = {row["framework_type"]: row["latencies"] for row in results}
+        proposed = latencies.get("proposed", [])
+        return {
+            framework: calculate_statistical_significance(values, proposed)
+            for framework, values in latencies.items()
+            if framework != "proposed"
+        }
+
     def calculate_system_performance_metrics(self, hours: int = 24) -> Dict[str, PerformanceMetrics]:
         """Calculate comprehensive system performance metrics"""
         # This would integrate with system monitoring (Prometheus, etc.)
@@ -232,7 +252,7 @@ class ThesisMetricsCalculator:
                         - created_at
                     )) / 60.0) as avg_session_duration_min
                 FROM zta.framework_comparison
-                WHERE created_at > NOW() - INTERVAL :hours HOUR
+                WHERE created_at > NOW() - make_interval(hours => :hours)
                 GROUP BY framework_type
             """)
 
@@ -283,7 +303,7 @@ class ThesisMetricsCalculator:
                     framework_type,
                     AVG(EXTRACT(EPOCH FROM (NOW() - created_at)) / 86400.0) as avg_retention_days
                 FROM zta.framework_comparison
-                WHERE created_at > NOW() - INTERVAL :hours HOUR
+                WHERE created_at > NOW() - make_interval(hours => :hours)
                 GROUP BY framework_type
             """), {"hours": hours}).mappings().all()
 
@@ -460,17 +480,53 @@ def calculate_statistical_significance(baseline_values: List[float],
     proposed_std = float(np.std(proposed_values))
 
     if scipy_available:
-        # Perform two-sample t-test
-        t_stat, p_value = stats.ttest_ind(baseline_values, proposed_values)
+        # Perform two-sample t-test; proposed first so the sign matches the
+        # effect size and CI below (all proposed - baseline)
+        t_stat, p_value = stats.ttest_ind(proposed_values, baseline_values)
+
+        baseline = np.asarray(baseline_values, dtype=float)
+        proposed = np.asarray(proposed_values, dtype=float)
+        n1, n2 = len(baseline), len(proposed)
+
+        # Hedges' g: Cohen's d on the pooled sample SD with the small-sample correction
+        hedges_g = 0.0
+        if n1 + n2 > 2:
+            pooled_var = (((baseline - baseline_mean) ** 2).sum()
+                          + ((proposed - proposed_mean) ** 2).sum()) / (n1 + n2 - 2)
+            if pooled_var > 0:
+                hedges_g = ((proposed_mean - baseline_mean) / np.sqrt(pooled_var)
+                            * (1 - 3 / (4 * (n1 + n2) - 9)))
+
+        # Percentile bootstrap CI for the difference in means over the full series.
+        # The statistic is vectorized; a small batch keeps each (batch, n) resample
+        # array bounded on run-length latency series.
+        def _mean_diff(b, p, axis=-1):
+            return np.mean(p, axis=axis) - np.mean(b, axis=axis)
+
+        ci_low = ci_high = None
+        if n1 > 1 and n2 > 1:
+            try:
+                res = stats.bootstrap((baseline, proposed), _mean_diff, n_resamples=10_000,
+                                      batch=50, vectorized=True, method="percentile",
+                                      random_state=np.random.default_rng(0))
+                ci_low = float(res.confidence_interval.low)
+                ci_high = float(res.confidence_interval.high)
+            except Exception as e:
+                logger.warning(f"Bootstrap CI failed: {e}")
 
         return {
             "t_statistic": float(t_stat),
             "p_value": float(p_value),
-            "significant": p_value < 0.05,
+            "significant": bool(p_value < 0.05),
             "baseline_mean": baseline_mean,
             "proposed_mean": proposed_mean,
             "baseline_std": baseline_std,
-            "proposed_std": proposed_std
+            "proposed_std": proposed_std,
+            "n_baseline": n1,
+            "n_proposed": n2,
+            "effect_size": float(hedges_g),
+            "mean_difference_ci95": [ci_low, ci_high],
+            "direction": "proposed - baseline"
         }
     else:
         # Basic comparison without statistical test
@@ -7,8 +7,8 @@ validation confidence) into a risk score and an allow/step_up/deny decision.
 
 import time
 import json
-import random
 import os
+import uuid
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime, timedelta
 import logging
@@ -65,7 +65,8 @@ class ProposedDecisionEngine:
         quality_confidence = validated_context.get('quality_confidence')
         checks = validated_context.get('checks', {})
 
-        session_id = vector.get('session_id', f'proposed-{int(time.time())}-{random.randint(1000, 9999)}')
+        # uuid4 like the simulator's own ids; the old time+4-digit suffix collided under load
+        session_id = vector.get('session_id') or f'proposed-{uuid.uuid4().hex[:12]}'
 
         # Validation Quality Assessment
         validation_quality = self._assess_validation_quality(weights, reasons, quality_confidence)
@@ -11,11 +11,11 @@ This script orchestrates the complete setup of the framework including:
 import os
 import sys
 import time
+import shutil
 import subprocess
 import logging
-import requests
-import psycopg
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 from pathlib import Path
 
 # Configure logging
@@ -25,6 +25,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Upper bound on waiting for application /health endpoints after compose up
+SERVICE_READY_TIMEOUT = 60
+
 class FrameworkSetup:
     """
     Main setup orchestrator for the Multi-Source MFA ZTA Framework
@@ -66,50 +69,87 @@ class FrameworkSetup:
             'psql': 'PostgreSQL client (optional - Docker handles database)'
         }
 
+        # The probes are independent fork/execs, so run them all at once and
+        # report in a fixed order afterwards
+        tools = list(required_tools) + list(optional_tools)
+        with ThreadPoolExecutor(max_workers=len(tools)) as pool:
+            probes = dict(zip(tools, pool.map(self._probe_tool, tools)))
+
         all_present = True
         for tool, message in required_tools.items():
-            try:
-                if tool == 'docker-compose':
-                    # Try both versions
-                    try:
-                        subprocess.run(['docker', 'compose', '--version'],
-                                     capture_output=True, check=True)
-                    except (subprocess.CalledProcessError, FileNotFoundError):
-                        subprocess.run(['docker-compose', '--version'],
-                                     capture_output=True, check=True)
-                else:
-                    subprocess.run([tool, '--version'],
-                                 capture_output=True, check=True)
+            failure = probes[tool]
+            if failure is None:
                 logger.info(f"✅ {tool} is installed")
-            except subprocess.CalledProcessError:
+            elif failure == 'not installed':
                 logger.error(f"❌ {tool} is not installed. {message}")
                 all_present = False
-            except FileNotFoundError:
+            else:
                 logger.error(f"❌ {tool} not found. {message}")
                 all_present = False
 
         # Check optional tools
         for tool, message in optional_tools.items():
-            try:
-                subprocess.run([tool, '--version'],
-                             capture_output=True, check=True)
+            if probes[tool] is None:
                 logger.info(f"✅ {tool} is installed")
-            except (subprocess.CalledProcessError, FileNotFoundError):
+            else:
                 logger.warning(f"⚠️ {tool} not found. {message}")
 
         # Check Python packages
         required_packages = ['psycopg', 'elasticsearch', 'requests', 'numpy']
+        missing_packages = []
         for package in required_packages:
             try:
                 __import__(package)
                 logger.info(f"✅ Python package '{package}' is installed")
             except ImportError:
                 logger.warning(f"⚠️ Python package '{package}' not found. Installing...")
-                subprocess.run([sys.executable, '-m', 'pip', 'install', package],
-                             capture_output=True)
+                missing_packages.append(package)
+
+        # One pip run resolves and downloads everything together; --prefer-binary
+        # takes cached/prebuilt wheels over source builds
+        if missing_packages:
+            returncode = self._run_streamed([sys.executable, '-m', 'pip', 'install',
+                                             '--prefer-binary', *missing_packages])
+            if returncode != 0:
+                logger.warning(f"⚠️ pip install exited with status {returncode}")
 
         return all_present
 
+    @staticmethod
+    def _run_streamed(cmd, **kwargs) -> int:
+        """Run cmd, logging its combined stdout/stderr line by line as it arrives
+        instead of buffering everything until exit. Returns the exit status."""
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              text=True, bufsize=1, **kwargs) as proc:
+            for line in proc.stdout:
+                logger.info(line.rstrip())
+        return proc.returncode
+
+    @staticmethod
+    def _probe_tool(tool: str) -> Optional[str]:
+        """Run `<tool> --version`; None if it works, else 'not installed' / 'not found'"""
+        # PATH lookup first: a missing binary fails here without a fork/exec
+        binaries = ['docker', 'docker-compose'] if tool == 'docker-compose' else [tool]
+        if not any(shutil.which(b) for b in binaries):
+            return 'not found'
+        try:
+            if tool == 'docker-compose':
+                # Try both versions
+                try:
+                    subprocess.run(['docker', 'compose', '--version'],
+                                 capture_output=True, check=True)
+                except (subprocess.CalledProcessError, FileNotFoundError):
+                    subprocess.run(['docker-compose', '--version'],
+                                 capture_output=True, check=True)
+            else:
+                subprocess.run([tool, '--version'],
+                             capture_output=True, check=True)
+            return None
+        except subprocess.CalledProcessError:
+            return 'not installed'
+        except FileNotFoundError:
+            return 'not found'
+
     def check_data_files(self) -> bool:
         """Verify that required data files exist"""
         logger.info("Checking data files...")
@@ -161,12 +201,13 @@ class FrameworkSetup:
                    'elasticsearch', 'kibana']
             subprocess.run(cmd, check=True, cwd=compose_file.parent)
 
-            # Wait for services to be ready
+            # Wait for services to be ready. Poll from the start instead of a
+            # fixed up-front sleep; the budget still covers the old 30s + 2min.
             logger.info("Waiting for infrastructure services to be ready...")
-            time.sleep(30)  # Give services time to start
+            import requests  # installed by check_prerequisites if missing
 
             # Check Elasticsearch
-            for i in range(60):  # Increased timeout to 2 minutes
+            for i in range(75):  # ~2.5 minutes at 2s per attempt
                 try:
                     response = requests.get(f"{self.config['elasticsearch_url']}/_cluster/health", timeout=5)
                     if response.status_code == 200:
@@ -177,7 +218,7 @@ class FrameworkSetup:
                         else:
                             logger.info(f"Elasticsearch status: {health['status']}, waiting...")
                 except (requests.RequestException, KeyError, ValueError) as e:
-                    logger.info(f"Elasticsearch check attempt {i+1}/60: {e}")
+                    logger.info(f"Elasticsearch check attempt {i+1}/75: {e}")
                 time.sleep(2)
             else:
                 logger.error("❌ Elasticsearch failed to start")
@@ -201,11 +242,14 @@ class FrameworkSetup:
             logger.error(f"Database schema file not found: {database_sql}")
             return False
 
+        # Imported here: check_prerequisites installs psycopg if it is missing
+        import psycopg
+        from psycopg import sql
+
         try:
             with psycopg.connect(self.config['db_dsn']) as conn:
                 with conn.cursor() as cur:
                     # Create schema if it doesn't exist
-                    from psycopg import sql
                     cur.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS zta"))
 
                     # Read and execute the SQL file
@@ -243,10 +287,6 @@ class FrameworkSetup:
             cmd = ['docker', 'compose', '-f', str(compose_file), 'up', '-d']
             subprocess.run(cmd, check=True, cwd=compose_file.parent)
 
-            logger.info("Waiting for services to be ready...")
-            time.sleep(20)
-
-            # Check each service
             services = [
                 ('Validation', self.config['validation_url']),
                 ('Trust', self.config['trust_url']),
@@ -256,20 +296,24 @@ class FrameworkSetup:
                 ('Metrics', self.config['metrics_url'])
             ]
 
+            # Poll /health with backoff (0.25s doubling to 2s) instead of a fixed
+            # sleep, until every service answers 200 or the timeout runs out
+            logger.info("Waiting for services to be ready...")
+            last_result = self._wait_for_health(dict(services), SERVICE_READY_TIMEOUT)
+
             all_ready = True
-            for service_name, url in services:
-                try:
-                    response = requests.get(f"{url}/health", timeout=5)
-                    if response.status_code == 200:
-                        logger.info(f"✅ {service_name} service is ready")
-                        self.services_status[service_name] = 'running'
-                    else:
-                        logger.warning(f"⚠️ {service_name} service returned status {response.status_code}")
-                        self.services_status[service_name] = 'unhealthy'
-                except Exception as e:
-                    logger.error(f"❌ {service_name} service not accessible: {e}")
+            for service_name, _ in services:
+                result = last_result[service_name]
+                if isinstance(result, Exception):
+                    logger.error(f"❌ {service_name} service not accessible: {result}")
                     self.services_status[service_name] = 'failed'
                     all_ready = False
+                elif result.status_code == 200:
+                    logger.info(f"✅ {service_name} service is ready")
+                    self.services_status[service_name] = 'running'
+                else:
+                    logger.warning(f"⚠️ {service_name} service returned status {result.status_code}")
+                    self.services_status[service_name] = 'unhealthy'
 
             return all_ready
 
@@ -277,6 +321,36 @@ class FrameworkSetup:
             logger.error(f"Failed to start application services: {e}")
             return False
 
+    @staticmethod
+    def _wait_for_health(services: Dict[str, str], timeout: float) -> Dict[str, object]:
+        """Probe each service's /health concurrently, re-probing the ones not yet
+        healthy with exponential backoff. Returns the last response or exception
+        per service."""
+        import requests
+
+        def probe(url):
+            try:
+                return requests.get(f"{url}/health", timeout=5)
+            except Exception as e:
+                return e
+
+        last_result = {}
+        pending = dict(services)
+        delay = 0.25
+        deadline = time.monotonic() + timeout
+        with ThreadPoolExecutor(max_workers=len(services)) as pool:
+            while pending:
+                names = list(pending)
+                for name, result in zip(names, pool.map(probe, (pending[n] for n in names))):
+                    last_result[name] = result
+                    if not isinstance(result, Exception) and result.status_code == 200:
+                        del pending[name]
+                if not pending or time.monotonic() + delay > deadline:
+                    break
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+        return last_result
+
     def generate_data(self) -> bool:
         """Generate framework comparison data"""
         logger.info("Generating framework comparison data...")
@@ -295,7 +369,8 @@ class FrameworkSetup:
             result = subprocess.run(
                 [sys.executable, str(generator_script)],
                 env=env,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True
             )
 
@@ -347,7 +422,8 @@ print('Indexing complete')
             result = subprocess.run(
                 [sys.executable, '-c', indexer_code],
                 env=env,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True
             )
 
@@ -380,7 +456,8 @@ print('Indexing complete')
             result = subprocess.run(
                 [sys.executable, str(dashboard_script)],
                 env=env,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
                 timeout=60
             )